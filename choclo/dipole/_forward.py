@@ -5,12 +5,16 @@
 # This code is part of the Fatiando a Terra project (https://www.fatiando.org)
 #
 import numpy as np
-from numba import jit
+from numba import jit, prange
 
 from ..constants import VACUUM_MAGNETIC_PERMEABILITY
+from ..utils import _FASTMATH_FLAGS
 
+# Constant factor mu_0 / (4 pi) of the magnetic field of a dipole
+_CM = VACUUM_MAGNETIC_PERMEABILITY / (4 * np.pi)
 
-@jit(nopython=True)
+
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, cache=True, error_model="numpy")
 def magnetic_field(
     easting_p,
     northing_p,
@@ -64,12 +68,18 @@ def magnetic_field(
     b_e : float
         Easting component of the magnetic field generated by the dipole
         on the observation point in :math:`\text{T}`.
+        It will be ``numpy.nan`` if the observation point and the dipole are
+        located in the same point.
     b_n : float
         Northing component of the magnetic field generated by the dipole
         on the observation point in :math:`\text{T}`.
+        It will be ``numpy.nan`` if the observation point and the dipole are
+        located in the same point.
     b_u : float
         Upward component of the magnetic field generated by the dipole
         on the observation point in :math:`\text{T}`.
+        It will be ``numpy.nan`` if the observation point and the dipole are
+        located in the same point.
 
     Notes
     -----
@@ -104,24 +114,25 @@ def magnetic_field(
     r_e = easting_p - easting_q
     r_n = northing_p - northing_q
     r_u = upward_p - upward_q
-    distance = np.sqrt(r_e**2 + r_n**2 + r_u**2)
+    inv_r = 1 / np.sqrt(r_e * r_e + r_n * r_n + r_u * r_u)
+    inv_r2 = inv_r * inv_r
+    inv_r3 = inv_r * inv_r2
     dotproduct = (
         magnetic_moment_east * r_e
         + magnetic_moment_north * r_n
         + magnetic_moment_up * r_u
     )
-    c_m = VACUUM_MAGNETIC_PERMEABILITY / 4 / np.pi
-    b_e = c_m * (
-        3 * dotproduct * r_e / distance**5 - magnetic_moment_east / distance**3
-    )
-    b_n = c_m * (
-        3 * dotproduct * r_n / distance**5 - magnetic_moment_north / distance**3
-    )
-    b_u = c_m * (3 * dotproduct * r_u / distance**5 - magnetic_moment_up / distance**3)
+    # Factor out the inverse cube of the distance so each component reduces
+    # to a single multiply-add
+    scale = 3 * dotproduct * inv_r2
+    factor = _CM * inv_r3
+    b_e = factor * (scale * r_e - magnetic_moment_east)
+    b_n = factor * (scale * r_n - magnetic_moment_north)
+    b_u = factor * (scale * r_u - magnetic_moment_up)
     return b_e, b_n, b_u
 
 
-@jit(nopython=True)
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, cache=True, error_model="numpy")
 def magnetic_e(
     easting_p,
     northing_p,
@@ -139,6 +150,14 @@ def magnetic_e(
     Returns the easting component of the magnetic field by a single dipole on
     a single computation point
 
+    .. note::
+
+        Use :func:`magnetic_field` when all the three components of the
+        magnetic field are needed: it computes them faster than calling
+        :func:`magnetic_e`, :func:`magnetic_n` and :func:`magnetic_u`
+        separately. Use :func:`magnetic_field_batch` to compute them for a set
+        of dipoles and observation points.
+
     Parameters
     ----------
     easting_p : float
@@ -168,6 +187,8 @@ def magnetic_e(
     b_e : float
         Easting component of the magnetic field generated by the dipole
         on the observation point in :math:`\text{T}`.
+        It will be ``numpy.nan`` if the observation point and the dipole are
+        located in the same point.
 
     Notes
     -----
@@ -199,20 +220,21 @@ def magnetic_e(
     :math:`\lVert \cdot \rVert` refer to the :math:`L_2` norm
     and :math:`\mu_0` is the vacuum magnetic permeability.
     """
-    r_e = easting_p - easting_q
-    r_n = northing_p - northing_q
-    r_u = upward_p - upward_q
-    distance = np.sqrt(r_e**2 + r_n**2 + r_u**2)
-    dotproduct = (
-        magnetic_moment_east * r_e
-        + magnetic_moment_north * r_n
-        + magnetic_moment_up * r_u
+    return _magnetic_component(
+        easting_p,
+        northing_p,
+        upward_p,
+        easting_q,
+        northing_q,
+        upward_q,
+        magnetic_moment_east,
+        magnetic_moment_north,
+        magnetic_moment_up,
+        0,
     )
-    result = 3 * dotproduct * r_e / distance**5 - magnetic_moment_east / distance**3
-    return VACUUM_MAGNETIC_PERMEABILITY / 4 / np.pi * result
 
 
-@jit(nopython=True)
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, cache=True, error_model="numpy")
 def magnetic_n(
     easting_p,
     northing_p,
@@ -230,6 +252,14 @@ def magnetic_n(
     Returns the northing component of the magnetic field by a single dipole on
     a single computation point
 
+    .. note::
+
+        Use :func:`magnetic_field` when all the three components of the
+        magnetic field are needed: it computes them faster than calling
+        :func:`magnetic_e`, :func:`magnetic_n` and :func:`magnetic_u`
+        separately. Use :func:`magnetic_field_batch` to compute them for a set
+        of dipoles and observation points.
+
     Parameters
     ----------
     easting_p : float
@@ -259,6 +289,8 @@ def magnetic_n(
     b_n : float
         Northing component of the magnetic field generated by the dipole on the
         observation point in :math:`\text{T}`.
+        It will be ``numpy.nan`` if the observation point and the dipole are
+        located in the same point.
 
     Notes
     -----
@@ -290,20 +322,21 @@ def magnetic_n(
     :math:`\lVert \cdot \rVert` refer to the :math:`L_2` norm
     and :math:`\mu_0` is the vacuum magnetic permeability.
     """
-    r_e = easting_p - easting_q
-    r_n = northing_p - northing_q
-    r_u = upward_p - upward_q
-    distance = np.sqrt(r_e**2 + r_n**2 + r_u**2)
-    dotproduct = (
-        magnetic_moment_east * r_e
-        + magnetic_moment_north * r_n
-        + magnetic_moment_up * r_u
+    return _magnetic_component(
+        easting_p,
+        northing_p,
+        upward_p,
+        easting_q,
+        northing_q,
+        upward_q,
+        magnetic_moment_east,
+        magnetic_moment_north,
+        magnetic_moment_up,
+        1,
     )
-    result = 3 * dotproduct * r_n / distance**5 - magnetic_moment_north / distance**3
-    return VACUUM_MAGNETIC_PERMEABILITY / 4 / np.pi * result
 
 
-@jit(nopython=True)
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, cache=True, error_model="numpy")
 def magnetic_u(
     easting_p,
     northing_p,
@@ -321,6 +354,14 @@ def magnetic_u(
     Returns the upward component of the magnetic field by a single dipole on
     a single computation point
 
+    .. note::
+
+        Use :func:`magnetic_field` when all the three components of the
+        magnetic field are needed: it computes them faster than calling
+        :func:`magnetic_e`, :func:`magnetic_n` and :func:`magnetic_u`
+        separately. Use :func:`magnetic_field_batch` to compute them for a set
+        of dipoles and observation points.
+
     Parameters
     ----------
     easting_p : float
@@ -350,6 +391,8 @@ def magnetic_u(
     b_u : float
         Upward component of the magnetic field generated by the dipole on the
         observation point in :math:`\text{T}`.
+        It will be ``numpy.nan`` if the observation point and the dipole are
+        located in the same point.
 
     Notes
     -----
@@ -381,14 +424,185 @@ def magnetic_u(
     :math:`\lVert \cdot \rVert` refer to the :math:`L_2` norm
     and :math:`\mu_0` is the vacuum magnetic permeability.
     """
+    return _magnetic_component(
+        easting_p,
+        northing_p,
+        upward_p,
+        easting_q,
+        northing_q,
+        upward_q,
+        magnetic_moment_east,
+        magnetic_moment_north,
+        magnetic_moment_up,
+        2,
+    )
+
+
+@jit(
+    nopython=True,
+    fastmath=_FASTMATH_FLAGS,
+    cache=True,
+    error_model="numpy",
+    inline="always",
+)
+def _magnetic_component(
+    easting_p,
+    northing_p,
+    upward_p,
+    easting_q,
+    northing_q,
+    upward_q,
+    magnetic_moment_east,
+    magnetic_moment_north,
+    magnetic_moment_up,
+    component,
+):
+    """
+    Compute a single component of the magnetic field due to a dipole
+
+    Shared implementation of :func:`magnetic_e`, :func:`magnetic_n` and
+    :func:`magnetic_u`. The ``component`` argument must be 0, 1 or 2 for the
+    easting, northing or upward component, respectively. Since this function
+    is inlined in its callers, Numba resolves the branches on ``component`` at
+    compile time.
+    """
     r_e = easting_p - easting_q
     r_n = northing_p - northing_q
     r_u = upward_p - upward_q
-    distance = np.sqrt(r_e**2 + r_n**2 + r_u**2)
+    inv_r = 1 / np.sqrt(r_e * r_e + r_n * r_n + r_u * r_u)
+    inv_r2 = inv_r * inv_r
+    inv_r3 = inv_r * inv_r2
     dotproduct = (
         magnetic_moment_east * r_e
         + magnetic_moment_north * r_n
         + magnetic_moment_up * r_u
     )
-    result = 3 * dotproduct * r_u / distance**5 - magnetic_moment_up / distance**3
-    return VACUUM_MAGNETIC_PERMEABILITY / 4 / np.pi * result
+    if component == 0:
+        r_c, magnetic_moment_c = r_e, magnetic_moment_east
+    elif component == 1:
+        r_c, magnetic_moment_c = r_n, magnetic_moment_north
+    else:
+        r_c, magnetic_moment_c = r_u, magnetic_moment_up
+    result = 3 * dotproduct * r_c * inv_r2 - magnetic_moment_c
+    return _CM * inv_r3 * result
+
+
+@jit(
+    nopython=True,
+    parallel=True,
+    fastmath=_FASTMATH_FLAGS,
+    cache=True,
+    error_model="numpy",
+)
+def magnetic_field_batch(
+    easting_p,
+    northing_p,
+    upward_p,
+    easting_q,
+    northing_q,
+    upward_q,
+    magnetic_moment_east,
+    magnetic_moment_north,
+    magnetic_moment_up,
+    b_e,
+    b_n,
+    b_u,
+):
+    r"""
+    Magnetic field due to a set of dipoles on a set of observation points
+
+    Computes the three components of the magnetic field that a collection of
+    dipoles generate on a collection of observation points in a single call.
+    The fields of every dipole are added together on each observation point.
+
+    .. important::
+
+        The magnetic field is **added** to the values in ``b_e``, ``b_n``
+        and ``b_u``. Initialize them with zeros unless you want to accumulate
+        the field of multiple calls.
+
+    Parameters
+    ----------
+    easting_p : (n,) array
+        Easting coordinates of the observation points in meters.
+    northing_p : (n,) array
+        Northing coordinates of the observation points in meters.
+    upward_p : (n,) array
+        Upward coordinates of the observation points in meters.
+    easting_q : (m,) array
+        Easting coordinates of the dipoles in meters.
+    northing_q : (m,) array
+        Northing coordinates of the dipoles in meters.
+    upward_q : (m,) array
+        Upward coordinates of the dipoles in meters.
+    magnetic_moment_east : (m,) array
+        The East component of the magnetic moment vector of each dipole. Must
+        be in :math:`A m^2`.
+    magnetic_moment_north : (m,) array
+        The North component of the magnetic moment vector of each dipole. Must
+        be in :math:`A m^2`.
+    magnetic_moment_up : (m,) array
+        The upward component of the magnetic moment vector of each dipole. Must
+        be in :math:`A m^2`.
+    b_e : (n,) array
+        Array where the easting component of the magnetic field on each
+        observation point will be added, in :math:`\text{T}`.
+    b_n : (n,) array
+        Array where the northing component of the magnetic field on each
+        observation point will be added, in :math:`\text{T}`.
+    b_u : (n,) array
+        Array where the upward component of the magnetic field on each
+        observation point will be added, in :math:`\text{T}`.
+
+    Notes
+    -----
+    Evaluates :func:`choclo.dipole.magnetic_field` for every pair of
+    observation point and dipole, and adds the three components to the output
+    arrays. The components are computed together for each pair, so it's faster
+    than looping over :func:`choclo.dipole.magnetic_e`,
+    :func:`choclo.dipole.magnetic_n` and :func:`choclo.dipole.magnetic_u`.
+
+    The field on observation points that coincide with any of the dipoles
+    will be ``numpy.nan``.
+
+    The observation points are distributed among parallel threads. Use
+    :func:`numba.set_num_threads` to control the number of threads.
+
+    Arrays can be either in double or in single precision. Single precision
+    arrays halve the memory that needs to be read, which speeds up large
+    forward models. Single precision arrays are only safe if the coordinates
+    are given relative to a local origin close to the observation points and
+    the dipoles (e.g. by subtracting the coordinates of the center of the
+    survey area in double precision before converting them to single
+    precision). Single precision floats have around seven significant digits,
+    so large coordinates, like UTM ones, lose most of their precision after
+    the conversion, which introduces errors of a few percent in the computed
+    field. With coordinates relative to a local origin, the errors are around
+    :math:`10^{-6}` times the largest absolute value of the field.
+
+    See Also
+    --------
+    :func:`choclo.dipole.magnetic_field`
+    """
+    for i in prange(easting_p.size):
+        # Accumulate the three components in local variables and write them
+        # to the output arrays once per observation point
+        sum_e, sum_n, sum_u = 0.0, 0.0, 0.0
+        for j in range(easting_q.size):
+            field_e, field_n, field_u = magnetic_field(
+                easting_p[i],
+                northing_p[i],
+                upward_p[i],
+                easting_q[j],
+                northing_q[j],
+                upward_q[j],
+                magnetic_moment_east[j],
+                magnetic_moment_north[j],
+                magnetic_moment_up[j],
+            )
+            sum_e += field_e
+            sum_n += field_n
+            sum_u += field_u
+        b_e[i] += sum_e
+        b_n[i] += sum_n
+        b_u[i] += sum_u
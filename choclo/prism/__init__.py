@@ -31,4 +31,11 @@ from ._kernels import (
     kernel_u,
     kernel_uu,
 )
-from ._magnetic import magnetic_e, magnetic_field, magnetic_n, magnetic_u
+from ._magnetic import (
+    magnetic_e,
+    magnetic_field,
+    magnetic_field_batch,
+    magnetic_n,
+    magnetic_tensor,
+    magnetic_u,
+)
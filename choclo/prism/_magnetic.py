@@ -7,10 +7,12 @@
 """
 Magnetic forward modelling functions for rectangular prisms
 """
-import numpy as np
-from numba import jit
+import math
+
+from numba import jit, prange
 
 from ..constants import VACUUM_MAGNETIC_PERMEABILITY
+from ..utils import _FASTMATH_FLAGS
 from ._kernels import kernel_ee, kernel_en, kernel_eu, kernel_nn, kernel_nu, kernel_uu
 from ._utils import (
     is_interior_point,
@@ -20,8 +22,11 @@ from ._utils import (
     is_point_on_top_face,
 )
 
+# Magnetic constant
+_CM = VACUUM_MAGNETIC_PERMEABILITY / (4 * math.pi)
+
 
-@jit(nopython=True)
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, error_model="numpy")
 def magnetic_field(
     easting,
     northing,
@@ -227,112 +232,9 @@ def magnetic_field(
     :func:`choclo.prism.magnetic_n`
     :func:`choclo.prism.magnetic_u`
     """
-    # Check if observation point falls in a singular point
-    if is_point_on_edge(
-        easting,
-        northing,
-        upward,
-        prism_west,
-        prism_east,
-        prism_south,
-        prism_north,
-        prism_bottom,
-        prism_top,
-    ) or is_interior_point(
-        easting,
-        northing,
-        upward,
-        prism_west,
-        prism_east,
-        prism_south,
-        prism_north,
-        prism_bottom,
-        prism_top,
-    ):
-        return (np.nan, np.nan, np.nan)
-    # Initialize magnetic field vector components
-    b_e, b_n, b_u = 0.0, 0.0, 0.0
-    # Iterate over the vertices of the prism
-    for i in range(2):
-        # Compute shifted easting coordinate
-        if i == 0:
-            shift_east = prism_east - easting
-        else:
-            shift_east = prism_west - easting
-        shift_east_sq = shift_east**2
-        for j in range(2):
-            # Compute shifted northing coordinate
-            if j == 0:
-                shift_north = prism_north - northing
-            else:
-                shift_north = prism_south - northing
-            shift_north_sq = shift_north**2
-            for k in range(2):
-                # Compute shifted upward coordinate
-                if k == 0:
-                    shift_upward = prism_top - upward
-                else:
-                    shift_upward = prism_bottom - upward
-                shift_upward_sq = shift_upward**2
-                # Compute the radius
-                radius = np.sqrt(shift_east_sq + shift_north_sq + shift_upward_sq)
-                # Compute all kernel tensor components for the current vertex
-                k_ee = kernel_ee(shift_east, shift_north, shift_upward, radius)
-                k_nn = kernel_nn(shift_east, shift_north, shift_upward, radius)
-                k_uu = kernel_uu(shift_east, shift_north, shift_upward, radius)
-                k_en = kernel_en(shift_east, shift_north, shift_upward, radius)
-                k_eu = kernel_eu(shift_east, shift_north, shift_upward, radius)
-                k_nu = kernel_nu(shift_east, shift_north, shift_upward, radius)
-                # Get the sign of this terms based on the current vertex
-                sign = (-1) ** (i + j + k)
-                # Compute the dot product between the kernel tensor and the
-                # magnetization vector of the prism
-                b_e += sign * (
-                    magnetization_east * k_ee
-                    + magnetization_north * k_en
-                    + magnetization_up * k_eu
-                )
-                b_n += sign * (
-                    magnetization_east * k_en
-                    + magnetization_north * k_nn
-                    + magnetization_up * k_nu
-                )
-                b_u += sign * (
-                    magnetization_east * k_eu
-                    + magnetization_north * k_nu
-                    + magnetization_up * k_uu
-                )
-    # Add 4 pi to Be if computing on the eastmost face, to correctly evaluate
-    # the limit approaching from outside (approaching from the east)
-    if is_point_on_east_face(
-        easting,
-        northing,
-        upward,
-        prism_west,
-        prism_east,
-        prism_south,
-        prism_north,
-        prism_bottom,
-        prism_top,
-    ):
-        b_e += 4 * np.pi * magnetization_east
-    # Add 4 pi to Bn if computing on the northmost face, to correctly evaluate
-    # the limit approaching from outside (approaching from the north)
-    if is_point_on_north_face(
-        easting,
-        northing,
-        upward,
-        prism_west,
-        prism_east,
-        prism_south,
-        prism_north,
-        prism_bottom,
-        prism_top,
-    ):
-        b_n += 4 * np.pi * magnetization_north
-    # Add 4 pi to Bu if computing on the north face, to correctly evaluate the
-    # limit approaching from outside (approaching from the top)
-    if is_point_on_top_face(
+    # Compute the kernel tensor of the prism on the observation point (it's
+    # nan on singular points and already includes the limits on the faces)
+    u_ee, u_nn, u_uu, u_en, u_eu, u_nu = magnetic_tensor(
         easting,
         northing,
         upward,
@@ -342,16 +244,20 @@ def magnetic_field(
         prism_north,
         prism_bottom,
         prism_top,
-    ):
-        b_u += 4 * np.pi * magnetization_up
-    c_m = VACUUM_MAGNETIC_PERMEABILITY / 4 / np.pi
-    b_e *= c_m
-    b_n *= c_m
-    b_u *= c_m
+    )
+    # Scale the magnetization vector by the magnetic constant
+    m_e = _CM * magnetization_east
+    m_n = _CM * magnetization_north
+    m_u = _CM * magnetization_up
+    # Compute the dot product between the kernel tensor and the scaled
+    # magnetization vector
+    b_e = u_ee * m_e + u_en * m_n + u_eu * m_u
+    b_n = u_en * m_e + u_nn * m_n + u_nu * m_u
+    b_u = u_eu * m_e + u_nu * m_n + u_uu * m_u
     return b_e, b_n, b_u
 
 
-@jit(nopython=True)
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, error_model="numpy")
 def magnetic_e(
     easting,
     northing,
@@ -475,69 +381,7 @@ def magnetic_e(
     :func:`choclo.prism.magnetic_n`
     :func:`choclo.prism.magnetic_u`
     """
-    # Check if observation point falls in a singular point
-    if is_point_on_edge(
-        easting,
-        northing,
-        upward,
-        prism_west,
-        prism_east,
-        prism_south,
-        prism_north,
-        prism_bottom,
-        prism_top,
-    ) or is_interior_point(
-        easting,
-        northing,
-        upward,
-        prism_west,
-        prism_east,
-        prism_south,
-        prism_north,
-        prism_bottom,
-        prism_top,
-    ):
-        return np.nan
-    # Initialize magnetic field vector component
-    b_e = 0.0
-    # Iterate over the vertices of the prism
-    for i in range(2):
-        # Compute shifted easting coordinate
-        if i == 0:
-            shift_east = prism_east - easting
-        else:
-            shift_east = prism_west - easting
-        shift_east_sq = shift_east**2
-        for j in range(2):
-            # Compute shifted northing coordinate
-            if j == 0:
-                shift_north = prism_north - northing
-            else:
-                shift_north = prism_south - northing
-            shift_north_sq = shift_north**2
-            for k in range(2):
-                # Compute shifted upward coordinate
-                if k == 0:
-                    shift_upward = prism_top - upward
-                else:
-                    shift_upward = prism_bottom - upward
-                shift_upward_sq = shift_upward**2
-                # Compute the radius
-                radius = np.sqrt(shift_east_sq + shift_north_sq + shift_upward_sq)
-                # Compute kernel tensor components for the current vertex
-                k_ee = kernel_ee(shift_east, shift_north, shift_upward, radius)
-                k_en = kernel_en(shift_east, shift_north, shift_upward, radius)
-                k_eu = kernel_eu(shift_east, shift_north, shift_upward, radius)
-                # Compute b_e using the dot product between the kernel tensor
-                # and the magnetization vector of the prism
-                b_e += (-1) ** (i + j + k) * (
-                    magnetization_east * k_ee
-                    + magnetization_north * k_en
-                    + magnetization_up * k_eu
-                )
-    # Add 4 pi to Be if computing on the eastmost face, to correctly evaluate
-    # the limit approaching from outside (approaching from the east)
-    if is_point_on_east_face(
+    return _magnetic_component(
         easting,
         northing,
         upward,
@@ -547,12 +391,14 @@ def magnetic_e(
         prism_north,
         prism_bottom,
         prism_top,
-    ):
-        b_e += 4 * np.pi * magnetization_east
-    return VACUUM_MAGNETIC_PERMEABILITY / 4 / np.pi * b_e
+        magnetization_east,
+        magnetization_north,
+        magnetization_up,
+        0,
+    )
 
 
-@jit(nopython=True)
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, error_model="numpy")
 def magnetic_n(
     easting,
     northing,
@@ -676,18 +522,7 @@ def magnetic_n(
     :func:`choclo.prism.magnetic_e`
     :func:`choclo.prism.magnetic_u`
     """
-    # Check if observation point falls in a singular point
-    if is_point_on_edge(
-        easting,
-        northing,
-        upward,
-        prism_west,
-        prism_east,
-        prism_south,
-        prism_north,
-        prism_bottom,
-        prism_top,
-    ) or is_interior_point(
+    return _magnetic_component(
         easting,
         northing,
         upward,
@@ -697,63 +532,14 @@ def magnetic_n(
         prism_north,
         prism_bottom,
         prism_top,
-    ):
-        return np.nan
-    # Initialize magnetic field vector component
-    b_n = 0.0
-    # Iterate over the vertices of the prism
-    for i in range(2):
-        # Compute shifted easting coordinate
-        if i == 0:
-            shift_east = prism_east - easting
-        else:
-            shift_east = prism_west - easting
-        shift_east_sq = shift_east**2
-        for j in range(2):
-            # Compute shifted northing coordinate
-            if j == 0:
-                shift_north = prism_north - northing
-            else:
-                shift_north = prism_south - northing
-            shift_north_sq = shift_north**2
-            for k in range(2):
-                # Compute shifted upward coordinate
-                if k == 0:
-                    shift_upward = prism_top - upward
-                else:
-                    shift_upward = prism_bottom - upward
-                shift_upward_sq = shift_upward**2
-                # Compute the radius
-                radius = np.sqrt(shift_east_sq + shift_north_sq + shift_upward_sq)
-                # Compute kernel tensor components for the current vertex
-                k_nn = kernel_nn(shift_east, shift_north, shift_upward, radius)
-                k_en = kernel_en(shift_east, shift_north, shift_upward, radius)
-                k_nu = kernel_nu(shift_east, shift_north, shift_upward, radius)
-                # Compute b_n using the dot product between the kernel tensor
-                # and the magnetization vector of the prism
-                b_n += (-1) ** (i + j + k) * (
-                    magnetization_east * k_en
-                    + magnetization_north * k_nn
-                    + magnetization_up * k_nu
-                )
-    # Add 4 pi to Bn if computing on the northmost face, to correctly evaluate
-    # the limit approaching from outside (approaching from the north)
-    if is_point_on_north_face(
-        easting,
-        northing,
-        upward,
-        prism_west,
-        prism_east,
-        prism_south,
-        prism_north,
-        prism_bottom,
-        prism_top,
-    ):
-        b_n += 4 * np.pi * magnetization_north
-    return VACUUM_MAGNETIC_PERMEABILITY / 4 / np.pi * b_n
+        magnetization_east,
+        magnetization_north,
+        magnetization_up,
+        1,
+    )
 
 
-@jit(nopython=True)
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, error_model="numpy")
 def magnetic_u(
     easting,
     northing,
@@ -877,6 +663,120 @@ def magnetic_u(
     :func:`choclo.prism.magnetic_e`
     :func:`choclo.prism.magnetic_n`
     """
+    return _magnetic_component(
+        easting,
+        northing,
+        upward,
+        prism_west,
+        prism_east,
+        prism_south,
+        prism_north,
+        prism_bottom,
+        prism_top,
+        magnetization_east,
+        magnetization_north,
+        magnetization_up,
+        2,
+    )
+
+
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, error_model="numpy")
+def magnetic_tensor(
+    easting,
+    northing,
+    upward,
+    prism_west,
+    prism_east,
+    prism_south,
+    prism_north,
+    prism_bottom,
+    prism_top,
+):
+    r"""
+    Kernel tensor of the magnetic field of a rectangular prism
+
+    Returns the six independent components of the symmetric tensor
+    :math:`\mathbf{U}` that relates the magnetization vector of the prism with
+    the magnetic field it generates on a single computation point.
+
+    .. note::
+
+        Use this function when the magnetic field of the same prism needs to
+        be computed for several magnetization vectors (like when building the
+        sensitivity matrix for a magnetic inversion). The tensor doesn't
+        depend on the magnetization, so it can be computed once and then
+        multiplied by each magnetization vector.
+
+    Parameters
+    ----------
+    easting : float
+        Easting coordinate of the observation point. Must be in meters.
+    northing : float
+        Northing coordinate of the observation point. Must be in meters.
+    upward : float
+        Upward coordinate of the observation point. Must be in meters.
+    prism_west : float
+        The West boundary of the prism. Must be in meters.
+    prism_east : float
+        The East boundary of the prism. Must be in meters.
+    prism_south : float
+        The South boundary of the prism. Must be in meters.
+    prism_north : float
+        The North boundary of the prism. Must be in meters.
+    prism_bottom : float
+        The bottom boundary of the prism. Must be in meters.
+    prism_top : float
+        The top boundary of the prism. Must be in meters.
+
+    Returns
+    -------
+    u_ee, u_nn, u_uu, u_en, u_eu, u_nu : float
+        Components of the kernel tensor :math:`\mathbf{U}` of the prism on the
+        observation point. They are dimensionless.
+        They will be ``numpy.nan`` if the observation point falls in a
+        singular point: prism vertices, prism edges or interior points.
+
+    Notes
+    -----
+    The magnetic field :math:`\mathbf{B}` generated by the prism with
+    a magnetization vector :math:`\mathbf{M}` on the observation point
+    :math:`\mathbf{p}` is
+
+    .. math::
+
+        \mathbf{B}(\mathbf{p}) = \frac{\mu_0}{4\pi} \mathbf{U} \cdot \mathbf{M}
+
+    where :math:`\mathbf{U}` is the symmetric tensor whose elements are
+
+    .. math::
+
+        u_{ij} =
+            \frac{\partial}{\partial i}
+            \frac{\partial}{\partial j}
+            \int\limits_R
+            \frac{1}{\lVert \mathbf{p} - \mathbf{q} \rVert}
+            dv
+
+    with :math:`i,j \in \{x, y, z\}`. See :func:`choclo.prism.magnetic_field`
+    for how they are computed.
+
+    On points that fall on the eastmost, northmost or top faces of the prism,
+    :math:`4\pi` is added to :math:`u_{xx}`, :math:`u_{yy}` or
+    :math:`u_{zz}`, respectively, to obtain the limit of the magnetic field
+    approaching from outside the prism.
+
+    References
+    ----------
+    - [Blakely1995]_
+    - [Oliveira2015]_
+    - [Nagy2000]_
+    - [Nagy2002]_
+    - [Fukushima2020]_
+
+    See Also
+    --------
+    :func:`choclo.prism.magnetic_field`
+    """
     # Check if observation point falls in a singular point
     if is_point_on_edge(
         easting,
@@ -899,46 +799,49 @@ def magnetic_u(
         prism_bottom,
         prism_top,
     ):
-        return np.nan
-    # Initialize magnetic field vector component
-    b_u = 0.0
-    # Iterate over the vertices of the prism
-    for i in range(2):
-        # Compute shifted easting coordinate
-        if i == 0:
-            shift_east = prism_east - easting
-        else:
-            shift_east = prism_west - easting
-        shift_east_sq = shift_east**2
-        for j in range(2):
-            # Compute shifted northing coordinate
-            if j == 0:
-                shift_north = prism_north - northing
-            else:
-                shift_north = prism_south - northing
-            shift_north_sq = shift_north**2
-            for k in range(2):
-                # Compute shifted upward coordinate
-                if k == 0:
-                    shift_upward = prism_top - upward
-                else:
-                    shift_upward = prism_bottom - upward
-                shift_upward_sq = shift_upward**2
-                # Compute the radius
-                radius = np.sqrt(shift_east_sq + shift_north_sq + shift_upward_sq)
-                # Compute kernel tensor components for the current vertex
-                k_uu = kernel_uu(shift_east, shift_north, shift_upward, radius)
-                k_eu = kernel_eu(shift_east, shift_north, shift_upward, radius)
-                k_nu = kernel_nu(shift_east, shift_north, shift_upward, radius)
-                # Compute b_n using the dot product between the kernel tensor
-                # and the magnetization vector of the prism
-                b_u += (-1) ** (i + j + k) * (
-                    magnetization_east * k_eu
-                    + magnetization_north * k_nu
-                    + magnetization_up * k_uu
-                )
-    # Add 4 pi to Bu if computing on the north face, to correctly evaluate the
-    # limit approaching from outside (approaching from the top)
+        return (math.nan, math.nan, math.nan, math.nan, math.nan, math.nan)
+    # Compute the shifted coordinates of the boundaries of the prism
+    shift_west, shift_east = prism_west - easting, prism_east - easting
+    shift_south, shift_north = prism_south - northing, prism_north - northing
+    shift_bottom, shift_top = prism_bottom - upward, prism_top - upward
+    # Add the kernels of the eight vertices of the prism, with alternating
+    # signs starting with a positive one on the (east, north, top) vertex
+    tensor = _vertex_kernels(shift_east, shift_north, shift_top)
+    tensor = _subtract_vertex_kernels(tensor, shift_east, shift_north, shift_bottom)
+    tensor = _subtract_vertex_kernels(tensor, shift_east, shift_south, shift_top)
+    tensor = _add_vertex_kernels(tensor, shift_east, shift_south, shift_bottom)
+    tensor = _subtract_vertex_kernels(tensor, shift_west, shift_north, shift_top)
+    tensor = _add_vertex_kernels(tensor, shift_west, shift_north, shift_bottom)
+    tensor = _add_vertex_kernels(tensor, shift_west, shift_south, shift_top)
+    tensor = _subtract_vertex_kernels(tensor, shift_west, shift_south, shift_bottom)
+    u_ee, u_nn, u_uu, u_en, u_eu, u_nu = tensor
+    # Add 4 pi to the diagonal components if computing on the eastmost,
+    # northmost or top face, to correctly evaluate the limit approaching from
+    # outside
+    if is_point_on_east_face(
+        easting,
+        northing,
+        upward,
+        prism_west,
+        prism_east,
+        prism_south,
+        prism_north,
+        prism_bottom,
+        prism_top,
+    ):
+        u_ee += 4 * math.pi
+    if is_point_on_north_face(
+        easting,
+        northing,
+        upward,
+        prism_west,
+        prism_east,
+        prism_south,
+        prism_north,
+        prism_bottom,
+        prism_top,
+    ):
+        u_nn += 4 * math.pi
     if is_point_on_top_face(
         easting,
         northing,
@@ -950,5 +853,343 @@ def magnetic_u(
         prism_bottom,
         prism_top,
     ):
-        b_u += 4 * np.pi * magnetization_up
-    return VACUUM_MAGNETIC_PERMEABILITY / 4 / np.pi * b_u
+        u_uu += 4 * math.pi
+    return u_ee, u_nn, u_uu, u_en, u_eu, u_nu
+
+
+@jit(nopython=True, parallel=True, fastmath=_FASTMATH_FLAGS, error_model="numpy")
+def magnetic_field_batch(
+    easting,
+    northing,
+    upward,
+    prism_west,
+    prism_east,
+    prism_south,
+    prism_north,
+    prism_bottom,
+    prism_top,
+    magnetization_east,
+    magnetization_north,
+    magnetization_up,
+    b_e,
+    b_n,
+    b_u,
+):
+    r"""
+    Magnetic field due to a set of prisms on a set of observation points
+
+    Computes the three components of the magnetic field that a collection of
+    rectangular prisms generate on a collection of observation points in
+    a single call. The fields of every prism are added together on each
+    observation point.
+
+    .. important::
+
+        The magnetic field is **added** to the values in ``b_e``, ``b_n``
+        and ``b_u``. Initialize them with zeros unless you want to accumulate
+        the field of multiple calls.
+
+    Parameters
+    ----------
+    easting : (n,) array
+        Easting coordinates of the observation points in meters.
+    northing : (n,) array
+        Northing coordinates of the observation points in meters.
+    upward : (n,) array
+        Upward coordinates of the observation points in meters.
+    prism_west : (m,) array
+        The West boundaries of the prisms in meters.
+    prism_east : (m,) array
+        The East boundaries of the prisms in meters.
+    prism_south : (m,) array
+        The South boundaries of the prisms in meters.
+    prism_north : (m,) array
+        The North boundaries of the prisms in meters.
+    prism_bottom : (m,) array
+        The bottom boundaries of the prisms in meters.
+    prism_top : (m,) array
+        The top boundaries of the prisms in meters.
+    magnetization_east : (m,) array
+        The East component of the magnetization vector of each prism. Must be
+        in :math:`A m^{-1}`.
+    magnetization_north : (m,) array
+        The North component of the magnetization vector of each prism. Must
+        be in :math:`A m^{-1}`.
+    magnetization_up : (m,) array
+        The upward component of the magnetization vector of each prism. Must
+        be in :math:`A m^{-1}`.
+    b_e : (n,) array
+        Array where the easting component of the magnetic field on each
+        observation point will be added, in :math:`\text{T}`.
+    b_n : (n,) array
+        Array where the northing component of the magnetic field on each
+        observation point will be added, in :math:`\text{T}`.
+    b_u : (n,) array
+        Array where the upward component of the magnetic field on each
+        observation point will be added, in :math:`\text{T}`.
+
+    Notes
+    -----
+    Evaluates :func:`choclo.prism.magnetic_field` for every pair of
+    observation point and prism, and adds the three components to the output
+    arrays. The components are computed together for each pair, so it's faster
+    than looping over :func:`choclo.prism.magnetic_e`,
+    :func:`choclo.prism.magnetic_n` and :func:`choclo.prism.magnetic_u`.
+
+    The field on observation points that fall in a singular point of any of
+    the prisms (vertices, edges or interior points) will be ``numpy.nan``.
+
+    The observation points are distributed among parallel threads. Use
+    :func:`numba.set_num_threads` to control the number of threads.
+
+    See Also
+    --------
+    :func:`choclo.prism.magnetic_field`
+    """
+    for i in prange(easting.size):
+        # Accumulate the three components in local variables and write them
+        # to the output arrays once per observation point
+        sum_e, sum_n, sum_u = 0.0, 0.0, 0.0
+        for j in range(prism_west.size):
+            field_e, field_n, field_u = magnetic_field(
+                easting[i],
+                northing[i],
+                upward[i],
+                prism_west[j],
+                prism_east[j],
+                prism_south[j],
+                prism_north[j],
+                prism_bottom[j],
+                prism_top[j],
+                magnetization_east[j],
+                magnetization_north[j],
+                magnetization_up[j],
+            )
+            sum_e += field_e
+            sum_n += field_n
+            sum_u += field_u
+        b_e[i] += sum_e
+        b_n[i] += sum_n
+        b_u[i] += sum_u
+
+
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, error_model="numpy", inline="always")
+def _magnetic_component(
+    easting,
+    northing,
+    upward,
+    prism_west,
+    prism_east,
+    prism_south,
+    prism_north,
+    prism_bottom,
+    prism_top,
+    magnetization_east,
+    magnetization_north,
+    magnetization_up,
+    component,
+):
+    """
+    Compute a single component of the magnetic field due to a prism
+
+    Shared implementation of :func:`magnetic_e`, :func:`magnetic_n` and
+    :func:`magnetic_u`. The ``component`` argument must be 0, 1 or 2 for the
+    easting, northing or upward component, respectively. Since this function
+    is inlined in its callers, Numba resolves the branches on ``component`` at
+    compile time and only the three kernels needed for the requested
+    component are evaluated.
+    """
+    # Check if observation point falls in a singular point
+    if is_point_on_edge(
+        easting,
+        northing,
+        upward,
+        prism_west,
+        prism_east,
+        prism_south,
+        prism_north,
+        prism_bottom,
+        prism_top,
+    ) or is_interior_point(
+        easting,
+        northing,
+        upward,
+        prism_west,
+        prism_east,
+        prism_south,
+        prism_north,
+        prism_bottom,
+        prism_top,
+    ):
+        return math.nan
+    # Compute the shifted coordinates of the boundaries of the prism
+    shift_west, shift_east = prism_west - easting, prism_east - easting
+    shift_south, shift_north = prism_south - northing, prism_north - northing
+    shift_bottom, shift_top = prism_bottom - upward, prism_top - upward
+    # Scale the magnetization vector by the magnetic constant once, instead of
+    # scaling the magnetic field after adding the terms of every vertex
+    magnetization = (
+        _CM * magnetization_east,
+        _CM * magnetization_north,
+        _CM * magnetization_up,
+    )
+    # Add the contributions of the eight vertices of the prism, with
+    # alternating signs starting with a positive one on the (east, north, top)
+    # vertex
+    b_c = _vertex_component(
+        shift_east, shift_north, shift_top, magnetization, component
+    )
+    b_c -= _vertex_component(
+        shift_east, shift_north, shift_bottom, magnetization, component
+    )
+    b_c -= _vertex_component(
+        shift_east, shift_south, shift_top, magnetization, component
+    )
+    b_c += _vertex_component(
+        shift_east, shift_south, shift_bottom, magnetization, component
+    )
+    b_c -= _vertex_component(
+        shift_west, shift_north, shift_top, magnetization, component
+    )
+    b_c += _vertex_component(
+        shift_west, shift_north, shift_bottom, magnetization, component
+    )
+    b_c += _vertex_component(
+        shift_west, shift_south, shift_top, magnetization, component
+    )
+    b_c -= _vertex_component(
+        shift_west, shift_south, shift_bottom, magnetization, component
+    )
+    # Add 4 pi to the component if computing on the eastmost, northmost or top
+    # face, respectively, to correctly evaluate the limit approaching from
+    # outside
+    if component == 0:
+        is_on_face = is_point_on_east_face(
+            easting,
+            northing,
+            upward,
+            prism_west,
+            prism_east,
+            prism_south,
+            prism_north,
+            prism_bottom,
+            prism_top,
+        )
+        magnetization_c = magnetization[0]
+    elif component == 1:
+        is_on_face = is_point_on_north_face(
+            easting,
+            northing,
+            upward,
+            prism_west,
+            prism_east,
+            prism_south,
+            prism_north,
+            prism_bottom,
+            prism_top,
+        )
+        magnetization_c = magnetization[1]
+    else:
+        is_on_face = is_point_on_top_face(
+            easting,
+            northing,
+            upward,
+            prism_west,
+            prism_east,
+            prism_south,
+            prism_north,
+            prism_bottom,
+            prism_top,
+        )
+        magnetization_c = magnetization[2]
+    if is_on_face:
+        b_c += 4 * math.pi * magnetization_c
+    return b_c
+
+
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, error_model="numpy", inline="always")
+def _vertex_kernels(shift_east, shift_north, shift_upward):
+    """
+    Compute the six kernel tensor components on a single vertex of the prism
+    """
+    # Compute the radius
+    radius = math.sqrt(shift_east**2 + shift_north**2 + shift_upward**2)
+    # Compute all kernel tensor components for the current vertex
+    k_ee = kernel_ee(shift_east, shift_north, shift_upward, radius)
+    k_nn = kernel_nn(shift_east, shift_north, shift_upward, radius)
+    k_uu = kernel_uu(shift_east, shift_north, shift_upward, radius)
+    k_en = kernel_en(shift_east, shift_north, shift_upward, radius)
+    k_eu = kernel_eu(shift_east, shift_north, shift_upward, radius)
+    k_nu = kernel_nu(shift_east, shift_north, shift_upward, radius)
+    return k_ee, k_nn, k_uu, k_en, k_eu, k_nu
+
+
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, error_model="numpy", inline="always")
+def _add_vertex_kernels(tensor, shift_east, shift_north, shift_upward):
+    """
+    Add the kernel tensor components of a single vertex to a running tensor
+    """
+    u_ee, u_nn, u_uu, u_en, u_eu, u_nu = tensor
+    k_ee, k_nn, k_uu, k_en, k_eu, k_nu = _vertex_kernels(
+        shift_east, shift_north, shift_upward
+    )
+    return (
+        u_ee + k_ee,
+        u_nn + k_nn,
+        u_uu + k_uu,
+        u_en + k_en,
+        u_eu + k_eu,
+        u_nu + k_nu,
+    )
+
+
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, error_model="numpy", inline="always")
+def _subtract_vertex_kernels(tensor, shift_east, shift_north, shift_upward):
+    """
+    Subtract the kernel tensor components of a single vertex from a running
+    tensor
+    """
+    u_ee, u_nn, u_uu, u_en, u_eu, u_nu = tensor
+    k_ee, k_nn, k_uu, k_en, k_eu, k_nu = _vertex_kernels(
+        shift_east, shift_north, shift_upward
+    )
+    return (
+        u_ee - k_ee,
+        u_nn - k_nn,
+        u_uu - k_uu,
+        u_en - k_en,
+        u_eu - k_eu,
+        u_nu - k_nu,
+    )
+
+
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, error_model="numpy", inline="always")
+def _vertex_component(shift_east, shift_north, shift_upward, magnetization, component):
+    """
+    Compute a single component of the magnetic field term of a vertex
+
+    Returns the dot product between a row of the kernel tensor evaluated on
+    the vertex and the magnetization vector (already scaled by the magnetic
+    constant), without the sign of the vertex. Only evaluates the three
+    kernels needed for the component given by ``component`` (0, 1 or 2 for the
+    easting, northing or upward component, respectively).
+    """
+    magnetization_east, magnetization_north, magnetization_up = magnetization
+    # Compute the radius
+    radius = math.sqrt(shift_east**2 + shift_north**2 + shift_upward**2)
+    # Compute the row of the kernel tensor for the requested component
+    if component == 0:
+        k_e = kernel_ee(shift_east, shift_north, shift_upward, radius)
+        k_n = kernel_en(shift_east, shift_north, shift_upward, radius)
+        k_u = kernel_eu(shift_east, shift_north, shift_upward, radius)
+    elif component == 1:
+        k_e = kernel_en(shift_east, shift_north, shift_upward, radius)
+        k_n = kernel_nn(shift_east, shift_north, shift_upward, radius)
+        k_u = kernel_nu(shift_east, shift_north, shift_upward, radius)
+    else:
+        k_e = kernel_eu(shift_east, shift_north, shift_upward, radius)
+        k_n = kernel_nu(shift_east, shift_north, shift_upward, radius)
+        k_u = kernel_uu(shift_east, shift_north, shift_upward, radius)
+    # Compute the dot product between the kernel tensor row and the
+    # magnetization vector of the prism
+    return magnetization_east * k_e + magnetization_north * k_n + magnetization_up * k_u
@@ -11,7 +11,13 @@ import numpy as np
 import numpy.testing as npt
 import pytest
 
-from ..dipole import magnetic_e, magnetic_field, magnetic_n, magnetic_u
+from ..dipole import (
+    magnetic_e,
+    magnetic_field,
+    magnetic_field_batch,
+    magnetic_n,
+    magnetic_u,
+)
 
 
 @pytest.fixture(name="sample_dipole")
@@ -666,6 +672,119 @@ class TestMagneticField:
         npt.assert_allclose(b_u, b_u_expected)
 
 
+class TestMagneticFieldBatch:
+    """
+    Test magnetic_field_batch against magnetic_field
+    """
+
+    @pytest.fixture
+    def sample_dipoles(self):
+        """
+        Return the location and magnetic moments of a set of sample dipoles
+        """
+        easting = np.array([40.5, -20.1, 3.2])
+        northing = np.array([32.4, 15.7, -43.0])
+        upward = np.array([-15.3, -45.2, -30.9])
+        moment_east = np.array([780.3, -150.2, 20.5])
+        moment_north = np.array([-230.4, 510.9, -89.3])
+        moment_up = np.array([1030, 300.1, -405.2])
+        return (
+            easting,
+            northing,
+            upward,
+            moment_east,
+            moment_north,
+            moment_up,
+        )
+
+    def test_magnetic_field_batch(self, sample_3d_grid, sample_dipoles):
+        """
+        Test magnetic_field_batch against adding up magnetic_field
+        """
+        b_e, b_n, b_u = tuple(np.zeros_like(sample_3d_grid[0]) for _ in range(3))
+        magnetic_field_batch(*sample_3d_grid, *sample_dipoles, b_e, b_n, b_u)
+        # Compute the expected field by adding the field of each dipole
+        b_expected = np.zeros((sample_3d_grid[0].size, 3))
+        for i, (e, n, u) in enumerate(zip(*sample_3d_grid)):
+            for dipole in zip(*sample_dipoles):
+                b_expected[i] += magnetic_field(e, n, u, *dipole)
+        npt.assert_allclose(b_e, b_expected[:, 0])
+        npt.assert_allclose(b_n, b_expected[:, 1])
+        npt.assert_allclose(b_u, b_expected[:, 2])
+
+    def test_accumulate(self, sample_3d_grid, sample_dipoles):
+        """
+        Test if magnetic_field_batch adds the field to the output arrays
+        """
+        b = tuple(np.zeros_like(sample_3d_grid[0]) for _ in range(3))
+        magnetic_field_batch(*sample_3d_grid, *sample_dipoles, *b)
+        b_twice = tuple(np.zeros_like(sample_3d_grid[0]) for _ in range(3))
+        for _ in range(2):
+            magnetic_field_batch(*sample_3d_grid, *sample_dipoles, *b_twice)
+        for component, component_twice in zip(b, b_twice):
+            npt.assert_allclose(component_twice, 2 * component)
+
+    def test_single_precision(self, sample_3d_grid, sample_dipoles):
+        """
+        Test magnetic_field_batch with single precision arrays
+        """
+        b = tuple(np.zeros_like(sample_3d_grid[0]) for _ in range(3))
+        magnetic_field_batch(*sample_3d_grid, *sample_dipoles, *b)
+        # Run with single precision arrays
+        b_single = tuple(
+            np.zeros_like(sample_3d_grid[0], dtype=np.float32) for _ in range(3)
+        )
+        magnetic_field_batch(
+            *(c.astype(np.float32) for c in sample_3d_grid),
+            *(a.astype(np.float32) for a in sample_dipoles),
+            *b_single,
+        )
+        for component, component_single in zip(b, b_single):
+            assert component_single.dtype == np.float32
+            atol = 1e-5 * np.abs(component).max()
+            npt.assert_allclose(component_single, component, rtol=1e-5, atol=atol)
+
+    def test_single_precision_large_offsets(self, sample_3d_grid, sample_dipoles):
+        """
+        Test magnetic_field_batch in single precision with UTM-like coordinates
+
+        Check that shifting the coordinates to a local origin before casting
+        them to single precision keeps the errors within the documented bound.
+        """
+        # Move the observation points and the dipoles far from the origin
+        origin_easting, origin_northing = 512_345.6, 7_012_345.8
+        easting, northing, upward = sample_3d_grid
+        coordinates = (easting + origin_easting, northing + origin_northing, upward)
+        dipoles = (
+            sample_dipoles[0] + origin_easting,
+            sample_dipoles[1] + origin_northing,
+            *sample_dipoles[2:],
+        )
+        b = tuple(np.zeros_like(easting) for _ in range(3))
+        magnetic_field_batch(*coordinates, *dipoles, *b)
+        # Shift to the local origin in double precision, then convert to
+        # single precision
+        local_coordinates = (
+            coordinates[0] - origin_easting,
+            coordinates[1] - origin_northing,
+            coordinates[2],
+        )
+        local_dipoles = (
+            dipoles[0] - origin_easting,
+            dipoles[1] - origin_northing,
+            *dipoles[2:],
+        )
+        b_single = tuple(np.zeros_like(easting, dtype=np.float32) for _ in range(3))
+        magnetic_field_batch(
+            *(c.astype(np.float32) for c in local_coordinates),
+            *(a.astype(np.float32) for a in local_dipoles),
+            *b_single,
+        )
+        for component, component_single in zip(b, b_single):
+            atol = 1e-5 * np.abs(component).max()
+            npt.assert_allclose(component_single, component, rtol=1e-5, atol=atol)
+
+
 class TestDivergenceOfB:
     """
     Test if the divergence of the magnetic field is equal to zero
@@ -766,3 +885,40 @@ class TestDivergenceOfB:
         )
         # Check if the divergence of B is zero
         npt.assert_allclose(-b_uu, b_ee + b_nn, atol=1e-12)
+
+
+class TestMagneticFieldOnDipole:
+    """
+    Test the magnetic field when the observation point and the dipole coincide
+    """
+
+    @pytest.mark.filterwarnings("ignore::RuntimeWarning")
+    @pytest.mark.parametrize(
+        "forward_func", (magnetic_field, magnetic_e, magnetic_n, magnetic_u)
+    )
+    def test_on_dipole(self, sample_dipole, sample_magnetic_moment, forward_func):
+        """
+        Test if the magnetic field components on the dipole are NaN
+        """
+        result = forward_func(*sample_dipole, *sample_dipole, *sample_magnetic_moment)
+        assert np.isnan(result).all()
+
+    @pytest.mark.filterwarnings("ignore::RuntimeWarning")
+    def test_batch_on_dipole(self, sample_dipole, sample_magnetic_moment):
+        """
+        Test if magnetic_field_batch is NaN only on the dipole location
+        """
+        easting, northing, upward = sample_dipole
+        coordinates = (
+            np.array([easting, easting + 10.0]),
+            np.array([northing, northing]),
+            np.array([upward, upward]),
+        )
+        dipoles = tuple(
+            np.array([c]) for c in (*sample_dipole, *sample_magnetic_moment)
+        )
+        b = tuple(np.zeros(2) for _ in range(3))
+        magnetic_field_batch(*coordinates, *dipoles, *b)
+        for component in b:
+            assert np.isnan(component[0])
+            assert np.isfinite(component[1])
@@ -4,10 +4,11 @@
 #
 # This code is part of the Fatiando a Terra project (https://www.fatiando.org)
 #
+import numpy as np
 import numpy.testing as npt
 import pytest
 
-from ..utils import distance_cartesian, distance_spherical
+from ..utils import distance_cartesian, distance_cartesian_sq, distance_spherical
 from .utils import dumb_spherical_distance
 
 
@@ -27,6 +28,22 @@ def test_distance_cartesian(point_a, point_b, expected_distance):
     npt.assert_allclose(distance_cartesian(*point_a, *point_b), expected_distance)
 
 
+@pytest.mark.parametrize(
+    "point_a, point_b, expected_distance_sq",
+    [
+        ((1.1, 1.2, 1.3), (2.4, 1.2, 1.3), 1.69),
+        ((1.1, 1.2, 1.3), (1.1, -0.2, 1.3), 1.96),
+        ((1.1, 1.2, 1.3), (1.1, 1.2, -2.4), 13.69),
+        ((2.5, 3.4, -1.6), (8.7, -5.2, 0.4), 116.4),
+    ],
+)
+def test_distance_cartesian_sq(point_a, point_b, expected_distance_sq):
+    """
+    Test if distance_cartesian_sq works as expected
+    """
+    npt.assert_allclose(distance_cartesian_sq(*point_a, *point_b), expected_distance_sq)
+
+
 class TestDistanceSpherical:
     """
     Tests for distance_spherical
@@ -78,3 +95,24 @@ class TestDistanceSpherical:
             distance_spherical(*point_a, *point_b),
             dumb_spherical_distance(point_a, point_b),
         )
+
+    @pytest.mark.parametrize("direction", ["longitude", "latitude"])
+    def test_close_points(self, direction):
+        """
+        Test spherical distance between two very close points
+
+        The cosine of the angle between the points is one in double precision,
+        so the distance should be computed without relying on it.
+        """
+        radius, angle = 6.4e6, 1e-9
+        if direction == "longitude":
+            point_a, point_b = (10.0, 0.0, radius), (10.0 + angle, 0.0, radius)
+        else:
+            point_a, point_b = (10.0, 20.0, radius), (10.0, 20.0 + angle, radius)
+        # Use the actual difference between the floating point angles
+        delta = max(abs(b - a) for a, b in zip(point_a[:2], point_b[:2]))
+        expected_distance = 2 * radius * np.sin(np.radians(delta) / 2)
+        # The sine and cosine of the latitudes limit the accuracy we can get
+        npt.assert_allclose(
+            distance_spherical(*point_a, *point_b), expected_distance, rtol=1e-4
+        )
@@ -11,7 +11,15 @@ import numpy as np
 import numpy.testing as npt
 import pytest
 
-from ..prism import magnetic_e, magnetic_field, magnetic_n, magnetic_u
+from ..constants import VACUUM_MAGNETIC_PERMEABILITY
+from ..prism import (
+    magnetic_e,
+    magnetic_field,
+    magnetic_field_batch,
+    magnetic_n,
+    magnetic_tensor,
+    magnetic_u,
+)
 
 
 @pytest.fixture(name="sample_prism")
@@ -698,6 +706,186 @@ class TestMagneticField:
         npt.assert_allclose(b_u, b_u_expected)
 
 
+class TestMagneticFieldBatch:
+    """
+    Test magnetic_field_batch against magnetic_field
+    """
+
+    @pytest.fixture
+    def sample_prisms(self, sample_prism):
+        """
+        Return the boundaries and magnetization vectors of a set of prisms
+
+        The first prism is the sample prism, so the points of the sample grid
+        that fall inside of it are singular points. The other ones are placed
+        beneath it, away from the points in the sample grid.
+        """
+        prisms = np.array(
+            [
+                sample_prism,
+                sample_prism + np.array([-30.0, -30.0, 15.5, 15.5, -120.0, -120.0]),
+                sample_prism + np.array([42.1, 42.1, -8.2, -8.2, -80.3, -80.3]),
+            ]
+        )
+        magnetizations = np.array(
+            [[314.3, -512.5, 256.9], [-120.4, 88.1, 405.3], [71.3, 230.5, -150.2]]
+        )
+        return (*prisms.T, *magnetizations.T)
+
+    def test_magnetic_field_batch(self, sample_3d_grid, sample_prisms):
+        """
+        Test magnetic_field_batch against adding up magnetic_field
+        """
+        b_e, b_n, b_u = tuple(np.zeros_like(sample_3d_grid[0]) for _ in range(3))
+        magnetic_field_batch(*sample_3d_grid, *sample_prisms, b_e, b_n, b_u)
+        # Compute the expected field by adding the field of each prism
+        b_expected = np.zeros((sample_3d_grid[0].size, 3))
+        for i, (e, n, u) in enumerate(zip(*sample_3d_grid)):
+            for prism in zip(*sample_prisms):
+                b_expected[i] += magnetic_field(e, n, u, *prism)
+        npt.assert_allclose(b_e, b_expected[:, 0])
+        npt.assert_allclose(b_n, b_expected[:, 1])
+        npt.assert_allclose(b_u, b_expected[:, 2])
+
+    def test_singular_points(self, sample_prism, sample_prisms):
+        """
+        Test if magnetic_field_batch is NaN only on singular points
+
+        Check an interior point and a point on an edge of the sample prism,
+        and a point above it.
+        """
+        easting, northing, upward = get_prism_center(sample_prism)
+        coordinates = (
+            np.array([easting, sample_prism[1], easting]),
+            np.array([northing, sample_prism[3], northing]),
+            np.array([upward, upward, sample_prism[5] + 10.0]),
+        )
+        b = tuple(np.zeros(3) for _ in range(3))
+        magnetic_field_batch(*coordinates, *sample_prisms, *b)
+        for component in b:
+            assert np.isnan(component[:2]).all()
+            assert np.isfinite(component[2])
+
+    def test_on_shared_face(self, sample_prism):
+        """
+        Test magnetic_field_batch on the face shared by two adjacent prisms
+
+        The field on a point on the shared face should be the sum of the limits
+        of the field of each prism approaching from outside of it.
+        """
+        width = sample_prism[1] - sample_prism[0]
+        prisms = np.array(
+            [sample_prism, sample_prism + np.array([width, width, 0, 0, 0, 0])]
+        )
+        magnetizations = np.array([[314.3, -512.5, 256.9], [-120.4, 88.1, 405.3]])
+        # Define a point on the center of the shared face
+        _, northing, upward = get_prism_center(sample_prism)
+        easting = sample_prism[1]
+        b = tuple(np.zeros(1) for _ in range(3))
+        magnetic_field_batch(
+            np.array([easting]),
+            np.array([northing]),
+            np.array([upward]),
+            *prisms.T,
+            *magnetizations.T,
+            *b,
+        )
+        # Approach the face from the east for the western prism and from the
+        # west for the eastern prism
+        delta = 1e-6
+        b_expected = np.array(
+            magnetic_field(
+                easting + delta, northing, upward, *prisms[0], *magnetizations[0]
+            )
+        ) + np.array(
+            magnetic_field(
+                easting - delta, northing, upward, *prisms[1], *magnetizations[1]
+            )
+        )
+        npt.assert_allclose(np.ravel(b), b_expected, rtol=1e-5)
+
+
+class TestMagneticTensor:
+    """
+    Test magnetic_tensor against magnetic_field
+    """
+
+    @pytest.mark.parametrize(
+        "magnetization",
+        [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0], [314.3, -512.5, 256.9]],
+    )
+    def test_magnetic_tensor(self, sample_3d_grid, sample_prism, magnetization):
+        """
+        Test if the dot product of the tensor and the magnetization matches
+        magnetic_field
+        """
+        b = np.array(
+            list(
+                magnetic_field(e, n, u, *sample_prism, *magnetization)
+                for e, n, u in zip(*sample_3d_grid)
+            )
+        )
+        u_ee, u_nn, u_uu, u_en, u_eu, u_nu = np.array(
+            list(
+                magnetic_tensor(e, n, u, *sample_prism)
+                for e, n, u in zip(*sample_3d_grid)
+            )
+        ).T
+        tensor = np.array([[u_ee, u_en, u_eu], [u_en, u_nn, u_nu], [u_eu, u_nu, u_uu]])
+        b_expected = (
+            VACUUM_MAGNETIC_PERMEABILITY
+            / (4 * np.pi)
+            * np.einsum("ijk,j->ki", tensor, magnetization)
+        )
+        atol = 1e-10 * np.nanmax(np.abs(b_expected))
+        npt.assert_allclose(b, b_expected, atol=atol)
+
+    def test_trace(self, sample_3d_grid, sample_prism):
+        """
+        Test if the trace of the tensor is zero outside the prism
+        """
+        u_ee, u_nn, u_uu, *_ = np.array(
+            list(
+                magnetic_tensor(e, n, u, *sample_prism)
+                for e, n, u in zip(*sample_3d_grid)
+            )
+        ).T
+        # Ignore the points of the grid that fall inside the prism
+        trace = u_ee + u_nn + u_uu
+        trace = trace[np.isfinite(trace)]
+        npt.assert_allclose(trace, 0, atol=1e-10)
+
+    @pytest.mark.parametrize("index", (0, 1, 2))
+    def test_on_faces(self, sample_prism, index):
+        """
+        Test if the tensor on the center of the faces matches magnetic_field
+
+        Check faces normal to the easting (index 0), northing (index 1) and
+        upward (index 2) directions.
+        """
+        magnetization = np.zeros(3)
+        magnetization[index] = 1.0
+        for boundary in sample_prism.reshape(3, 2)[index]:
+            point = list(get_prism_center(sample_prism))
+            point[index] = boundary
+            b = magnetic_field(*point, *sample_prism, *magnetization)[index]
+            u_diagonal = magnetic_tensor(*point, *sample_prism)[index]
+            npt.assert_allclose(
+                b, VACUUM_MAGNETIC_PERMEABILITY / (4 * np.pi) * u_diagonal
+            )
+
+    def test_on_vertices(self, sample_prism):
+        """
+        Test if the tensor components on vertices are equal to NaN
+        """
+        vertices = np.meshgrid(sample_prism[0:2], sample_prism[2:4], sample_prism[4:6])
+        results = list(
+            magnetic_tensor(e, n, u, *sample_prism)
+            for e, n, u in zip(*(c.ravel() for c in vertices))
+        )
+        assert np.isnan(results).all()
+
+
 class TestDivergenceOfB:
     """
     Test if the divergence of the magnetic field is equal to zero
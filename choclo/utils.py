@@ -7,11 +7,21 @@
 """
 Utility functions for the kernel and forward modelling functions
 """
+import math
+
 import numpy as np
 from numba import jit
 
+# Factor to convert angles from degrees to radians
+_DEG2RAD = np.pi / 180
+
+# Fast-math flags for the compiled functions. Exclude the "nnan" and "ninf"
+# flags: some functions return NaN or infinite values on singular points, and
+# those flags would make such values undefined behaviour.
+_FASTMATH_FLAGS = {"nsz", "arcp", "contract", "afn", "reassoc"}
 
-@jit(nopython=True)
+
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, cache=True, error_model="numpy")
 def distance_cartesian(
     easting_p, northing_p, upward_p, easting_q, northing_q, upward_q
 ):
@@ -55,14 +65,69 @@ def distance_cartesian(
 
     """
     distance = np.sqrt(
+        distance_cartesian_sq(
+            easting_p, northing_p, upward_p, easting_q, northing_q, upward_q
+        )
+    )
+    return distance
+
+
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, cache=True, error_model="numpy")
+def distance_cartesian_sq(
+    easting_p, northing_p, upward_p, easting_q, northing_q, upward_q
+):
+    r"""
+    Squared Euclidean distance between two points in Cartesian coordinates
+
+    Use this function instead of :func:`choclo.utils.distance_cartesian` when
+    the distance is only needed squared or raised to an even power: it avoids
+    computing a square root.
+
+    .. warning::
+
+        All coordinates should be in the same units.
+
+    Parameters
+    ----------
+    easting_p : float
+        Easting coordinate of point :math:`\mathbf{p}`.
+    northing_p : float
+        Northing coordinate of point :math:`\mathbf{p}`.
+    upward_p : float
+        Upward coordinate of point :math:`\mathbf{p}`.
+    easting_q : float
+        Easting coordinate of point :math:`\mathbf{q}`.
+    northing_q : float
+        Northing coordinate of point :math:`\mathbf{q}`.
+    upward_q : float
+        Upward coordinate of point :math:`\mathbf{q}`.
+
+    Returns
+    -------
+    distance_sq : float
+        Squared Euclidean distance between ``point_p`` and ``point_q``.
+
+    Notes
+    -----
+    Given two points :math:`\mathbf{p} = (x_p, y_p, z_p)` and
+    :math:`\mathbf{q} = (x_q, y_q, z_q)` defined in a Cartesian coordinate
+    system :math:`(x, y, z)`, return the square of the Euclidean (L2)
+    distance between them:
+
+    .. math::
+
+        d^2 = (x_p - x_q)^2 + (y_p - y_q)^2 + (z_p - z_q)^2
+
+    """
+    distance_sq = (
         (easting_p - easting_q) ** 2
         + (northing_p - northing_q) ** 2
         + (upward_p - upward_q) ** 2
     )
-    return distance
+    return distance_sq
 
 
-@jit(nopython=True)
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, cache=True, error_model="numpy")
 def distance_spherical(
     longitude_p, latitude_p, radius_p, longitude_q, latitude_q, radius_q
 ):
@@ -73,6 +138,13 @@ def distance_spherical(
 
         All angles must be in degrees and radii in meters.
 
+    .. tip::
+
+        When computing the distance between one point and many others, convert
+        the longitudes to radians and compute the sine and cosine of the
+        latitudes only once per point, and pass them to
+        :func:`choclo.utils.distance_spherical_core` instead.
+
     Parameters
     ----------
     longitude_p : float
@@ -116,13 +188,15 @@ def distance_spherical(
     latitude angle an :math:`r` is the radial coordinate.
     """
     # Convert angles to radians
-    longitude_p, latitude_p = np.radians(longitude_p), np.radians(latitude_p)
-    longitude_q, latitude_q = np.radians(longitude_q), np.radians(latitude_q)
+    longitude_p, latitude_p = longitude_p * _DEG2RAD, latitude_p * _DEG2RAD
+    longitude_q, latitude_q = longitude_q * _DEG2RAD, latitude_q * _DEG2RAD
     # Compute trigonometric quantities
-    cosphi_p = np.cos(latitude_p)
-    sinphi_p = np.sin(latitude_p)
-    cosphi_q = np.cos(latitude_q)
-    sinphi_q = np.sin(latitude_q)
+    # (sine and cosine of each angle are evaluated next to each other so the
+    # compiler may fuse them into a single sincos call)
+    sinphi_p = math.sin(latitude_p)
+    cosphi_p = math.cos(latitude_p)
+    sinphi_q = math.sin(latitude_q)
+    cosphi_q = math.cos(latitude_q)
     distance, _, _ = distance_spherical_core(
         longitude_p,
         cosphi_p,
@@ -136,7 +210,7 @@ def distance_spherical(
     return distance
 
 
-@jit(nopython=True)
+@jit(nopython=True, fastmath=_FASTMATH_FLAGS, cache=True, error_model="numpy")
 def distance_spherical_core(
     longitude_p, cosphi_p, sinphi_p, radius_p, longitude_q, cosphi_q, sinphi_q, radius_q
 ):
@@ -145,7 +219,7 @@ def distance_spherical_core(
 
     .. important::
 
-        All longitudinal angles must be in degrees.
+        All longitudinal angles must be in radians.
 
     It computes the Euclidean distance between two points defined in spherical
     coordinates given precomputed quantities related to the coordinates of both
@@ -209,10 +283,37 @@ def distance_spherical_core(
 
     where :math:`\lambda` is the longitude angle, :math:`\phi` the spherical
     latitude angle an :math:`r` is the radial coordinate.
+
+    To avoid losing accuracy when both points are close to each other, the
+    :math:`1 - \cos\psi` term is computed through the haversine formula:
+
+    .. math::
+
+        1 - \cos\psi =
+        1 - \cos(\phi_p - \phi_q)
+        + 2 \cos\phi_p \cos\phi_q \sin^2
+        \left( \frac{\lambda_p - \lambda_q}{2} \right),
+
+    where :math:`1 - \cos(\phi_p - \phi_q)` is obtained from the sine and
+    cosine of the difference between the latitude angles.
     """
-    coslambda = np.cos(longitude_q - longitude_p)
-    cospsi = sinphi_q * sinphi_p + cosphi_q * cosphi_p * coslambda
-    distance = np.sqrt(
-        (radius_p - radius_q) ** 2 + 2 * radius_p * radius_q * (1 - cospsi)
+    # Compute the sine of half the difference between longitudes
+    sin_half_dlambda = math.sin(0.5 * (longitude_q - longitude_p))
+    # Compute 1 - cos(phi_p - phi_q), avoiding the cancellation for close
+    # latitudes by using 1 - cos(x) = sin(x)**2 / (1 + cos(x))
+    cos_dphi = cosphi_q * cosphi_p + sinphi_q * sinphi_p
+    if cos_dphi > 0:
+        sin_dphi = sinphi_q * cosphi_p - cosphi_q * sinphi_p
+        one_minus_cos_dphi = sin_dphi**2 / (1 + cos_dphi)
+    else:
+        one_minus_cos_dphi = 1 - cos_dphi
+    # Compute 1 - cos(psi) through the haversine formula
+    one_minus_cospsi = (
+        one_minus_cos_dphi + 2 * cosphi_q * cosphi_p * sin_half_dlambda**2
+    )
+    coslambda = 1 - 2 * sin_half_dlambda**2
+    cospsi = 1 - one_minus_cospsi
+    distance = math.sqrt(
+        (radius_p - radius_q) ** 2 + 2 * radius_p * radius_q * one_minus_cospsi
     )
     return distance, cospsi, coslambda